@@ -96,18 +96,18 @@ def contains_pytest_match_arg(patch_test_text: str) -> bool:
     """
     Returns True if the test patch contains a pytest.raises() call with a match argument.
     """
-    if any([x in patch_test_text for x in [
+    if any(x in patch_test_text for x in [
         'pytest.raises',
         'pytest.warns',
         'pytest.deprecated_call',
-        ]]):
+        ]):
         return 'match' in patch_test_text
     # Django style assertions:
-    if any([x in patch_test_text for x in [
+    if any(x in patch_test_text for x in [
         'assertOutput',
         'assertRaises',
         'checks.Error',
-        ]]):
+        ]):
         return True
     return False
 
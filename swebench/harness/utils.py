@@ -149,7 +149,7 @@ def has_attribute_or_import_error(log_before):
     """
     log_before = log_before.lower()
 
-    if any([x in log_before for x in ["attribute", "import"]]):
+    if any(x in log_before for x in ["attribute", "import"]):
 
         def get_lines_with_word(text, target_word):
             # Function to extract line(s) that contains target_word
@@ -166,7 +166,7 @@ def has_attribute_or_import_error(log_before):
         lines_1 = " ".join(lines_1)
         lines_2 = " ".join(lines_2)
 
-        if any([(x in lines_1 or x in lines_2) for x in ["error", "fail"]]):
+        if any((x in lines_1 or x in lines_2) for x in ["error", "fail"]):
             return True
     return False
 
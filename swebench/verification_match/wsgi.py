@@ -0,0 +1,25 @@
+"""
+Production entry point for the verification server.
+
+The Flask dev server in verification_matcher's __main__ block is fine
+for local runs, but it handles one request at a time per thread and is
+not meant to sit behind real load. Point a WSGI server at this module
+instead, from the verification_match directory:
+
+    gunicorn wsgi:app -w 1 --threads 8 --timeout 600 -b 0.0.0.0:5001
+
+Keep a single worker process (-w 1): the job table, corpus index and
+result cache live in module globals, and the harness run lock only
+serializes verifications inside one process. Threads are the right
+scaling axis here because submit/poll requests are I/O-bound and the
+heavy lifting happens in the background executor.
+"""
+
+import os
+
+from verification_matcher import app, _get_corpus_index
+
+# Warm the corpus index at import time, mirroring the __main__ block, so
+# the first request after a gunicorn (re)start doesn't pay the parse cost.
+if os.path.isfile("./complete_300_lite_input.txt"):
+    _get_corpus_index("./complete_300_lite_input.txt")
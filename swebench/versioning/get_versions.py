@@ -257,7 +257,7 @@ def main(args):
     )
 
     # If retrieval method includes GitHub, then search GitHub for versions via parallel call
-    if any([x == args.retrieval_method for x in ["github", "mix"]]):
+    if any(x == args.retrieval_method for x in ["github", "mix"]):
         manager = Manager()
         shared_result_list = manager.list()
         pool = Pool(processes=args.num_workers)
@@ -296,8 +296,8 @@ def main(args):
             )
 
     # Check that all required arguments for installing task instances are present
-    assert any([x == args.retrieval_method for x in ["build", "mix"]])
-    assert all([x in args for x in ["testbed", "path_conda", "conda_env"]])
+    assert any(x == args.retrieval_method for x in ["build", "mix"])
+    assert all(x in args for x in ["testbed", "path_conda", "conda_env"])
     conda_exec = os.path.join(args.path_conda, "bin/conda")
 
     cwd = os.getcwd()
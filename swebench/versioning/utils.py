@@ -10,7 +10,7 @@ def get_instances(instance_path: str) -> list:
     Returns:
         task_instances (list): List of task instances
     """
-    if any([instance_path.endswith(x) for x in [".jsonl", ".jsonl.all"]]):
+    if any(instance_path.endswith(x) for x in [".jsonl", ".jsonl.all"]):
         task_instances = list()
         with open(instance_path) as f:
             for line in f.readlines():